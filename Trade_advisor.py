@@ -1,8 +1,19 @@
+import hashlib
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
 import streamlit as st
 import yfinance as yf
+from curl_cffi import requests as curl_requests
 import pandas as pd
 import numpy as np
-import matplotlib.pyplot as plt
+from numpy.lib.stride_tricks import sliding_window_view
+import bottleneck as bn
+import numexpr as ne
+from numba import njit
+import plotly.graph_objects as go
 
 st.set_page_config(page_title="RSI-Adjusted S/R Advisor", layout="wide")
 st.title("RSI-Adjusted Support/Resistance Trading Advisor")
@@ -34,31 +45,101 @@ with colP3:
 # =========================
 # ===== Data Loader =======
 # =========================
+CACHE_DIR = Path(".cache/yf")
+# Seconds a downloaded (ticker, period, interval) stays fresh on disk, by bar interval
+CACHE_TTL = {
+    "1m": 5 * 60, "5m": 5 * 60,
+    "15m": 30 * 60, "30m": 30 * 60, "1h": 30 * 60,
+    "1d": 12 * 3600, "1wk": 12 * 3600,
+}
+
+# Longest period Yahoo serves for each interval
+MAX_PERIOD = {
+    "1m": "7d", "5m": "60d", "15m": "60d", "30m": "60d",
+    "1h": "730d", "1d": "max", "1wk": "max",
+}
+
+def period_days(per: str) -> float:
+    if per == "max":
+        return float("inf")
+    for suffix, days in (("mo", 30), ("wk", 7), ("d", 1), ("y", 365)):
+        if per.endswith(suffix):
+            return int(per[:-len(suffix)]) * days
+    return float("inf")
+
+# One HTTP session per server process, so every download reuses its keep-alive connection
+@st.cache_resource
+def http_session() -> curl_requests.Session:
+    return curl_requests.Session(impersonate="chrome")
+
+def download_cached(sym: str, per: str, itv: str, session: curl_requests.Session) -> pd.DataFrame:
+    key = hashlib.md5(f"{sym}|{per}|{itv}".encode()).hexdigest()
+    data_path = CACHE_DIR / f"{key}.parquet"
+    meta_path = CACHE_DIR / f"{key}.json"
+
+    try:
+        meta = json.loads(meta_path.read_text())
+        if time.time() - meta["fetched_at"] < CACHE_TTL.get(itv, 600):
+            return pd.read_parquet(data_path)
+    except (OSError, ValueError, KeyError, ImportError):
+        pass
+
+    df = yf.Ticker(sym, session=session).history(period=per, interval=itv, auto_adjust=True)
+    if not df.empty:
+        df = df[["Open", "High", "Low", "Close", "Volume"]]
+        try:
+            CACHE_DIR.mkdir(parents=True, exist_ok=True)
+            df.to_parquet(data_path)
+            meta_path.write_text(json.dumps({"fetched_at": time.time()}))
+        except (OSError, ImportError):
+            pass
+    return df
+
 @st.cache_data(ttl=600, show_spinner=True)
 def load_data(sym: str, per: str, itv: str, fix: bool = True) -> pd.DataFrame:
     attempts = []
     tried = []
 
-    combos = [(per, itv)]
-    if fix:
-        combos.extend([
-            ("1y", "1d"),
-            ("6mo", "1d"),
-            ("1mo", "1h"),
-            ("7d", "1h"),
-            ("60d", "5m"),
-        ])
-
-    for p, i in combos:
-        try:
-            df = yf.download(sym, period=p, interval=i, auto_adjust=True, progress=False)
-            tried.append((p, i, len(df)))
-            if not df.empty:
-                if isinstance(df.columns, pd.MultiIndex):
-                    df.columns = df.columns.get_level_values(0)
-                return df, tried
-        except Exception as e:
-            attempts.append(f"{p}/{i} failed: {e}")
+    if fix and period_days(per) > period_days(MAX_PERIOD.get(itv, "max")):
+        per = MAX_PERIOD[itv]
+
+    # Resolved on the script thread; fallback workers have no ScriptRunContext for st.cache_resource
+    session = http_session()
+
+    # The clamped request is the only one sent unless it fails or comes back empty
+    try:
+        df = download_cached(sym, per, itv, session)
+        tried.append((per, itv, len(df)))
+        if not df.empty:
+            return df, tried
+    except Exception as e:
+        attempts.append(f"{per}/{itv} failed: {e}")
+
+    if not fix:
+        return pd.DataFrame(), tried
+
+    combos = [c for c in [
+        ("1y", "1d"),
+        ("6mo", "1d"),
+        ("1mo", "1h"),
+        ("7d", "1h"),
+        ("60d", "5m"),
+    ] if c != (per, itv)]
+
+    # Fallbacks download concurrently but are still taken in preference order
+    ex = ThreadPoolExecutor(max_workers=len(combos))
+    futs = [(p, i, ex.submit(download_cached, sym, p, i, session)) for p, i in combos]
+    try:
+        for p, i, fut in futs:
+            try:
+                df = fut.result()
+                tried.append((p, i, len(df)))
+                if not df.empty:
+                    return df, tried
+            except Exception as e:
+                attempts.append(f"{p}/{i} failed: {e}")
+    finally:
+        ex.shutdown(wait=False, cancel_futures=True)
 
     return pd.DataFrame(), tried
 
@@ -75,56 +156,131 @@ if prices.empty:
     )
     st.stop()
 
+# Fingerprint of the fetched bars; keys the caches of everything derived from them
+prices_key = hashlib.md5(prices.to_numpy().tobytes() + prices.index.asi8.tobytes()).hexdigest()
+
+NOT_ENOUGH_BARS = (
+    "Not enough bars after applying lookback/smoothing. Increase the period, reduce lookback/smoothing, or choose a higher timeframe."
+)
+
+if len(prices) < lookback + smoothLength - 1:
+    st.warning(NOT_ENOUGH_BARS)
+    st.stop()
+
 # =========================
 # ===== Indicators =========
 # =========================
 
-def rsi_series(close: pd.Series, period: int = 14) -> pd.Series:
-    delta = close.diff()
-    gain = np.where(delta > 0, delta, 0)
-    loss = np.where(delta < 0, -delta, 0)
-    avg_gain = pd.Series(gain, index=close.index).rolling(window=period, min_periods=1).mean()
-    avg_loss = pd.Series(loss, index=close.index).rolling(window=period, min_periods=1).mean()
-    rs = avg_gain / avg_loss
-    rsi = 100 - (100 / (1 + rs))
+def rsi_series(close: np.ndarray, period: int = 14) -> np.ndarray:
+    # Wilder RSI: SMA of gains/losses over the first `period` deltas, then recursive smoothing
+    n = close.shape[0]
+    rsi = np.empty(n, dtype=close.dtype)
+    rsi[:period] = np.nan
+    avg_gain = 0.0
+    avg_loss = 0.0
+    for i in range(1, n):
+        delta = close[i] - close[i - 1]
+        gain = delta if delta > 0 else 0.0
+        loss = -delta if delta < 0 else 0.0
+        if i <= period:
+            avg_gain += gain / period
+            avg_loss += loss / period
+        else:
+            avg_gain = (avg_gain * (period - 1) + gain) / period
+            avg_loss = (avg_loss * (period - 1) + loss) / period
+        if i < period:
+            continue
+        if avg_loss > 0.0:
+            rsi[i] = 100.0 - 100.0 / (1.0 + avg_gain / avg_loss)
+        else:
+            rsi[i] = 100.0 if avg_gain > 0.0 else np.nan
     return rsi
 
-prices = prices.rename(columns={"Close": "Close", "Open": "Open", "High": "High", "Low": "Low", "Volume": "Volume"})
-prices["RSI"] = rsi_series(prices["Close"], rsiPeriod)
-prices["RSI_diff"] = (prices["RSI"] - 50).abs() / 50
+# Streamlit re-executes the script on every rerun, which would re-run a bare @njit decorator.
+# Holding the dispatcher as a resource keeps its compiled specializations for the process.
+@st.cache_resource(show_spinner=False)
+def rsi_kernel():
+    return njit(cache=True)(rsi_series)
 
-prices["Base_Support"] = prices["Close"].rolling(lookback, min_periods=lookback).min()
-prices["Base_Resistance"] = prices["Close"].rolling(lookback, min_periods=lookback).max()
-prices["Range"] = prices["Base_Resistance"] - prices["Base_Support"]
+def rolling_min_max(close: np.ndarray, window: int) -> tuple[np.ndarray, np.ndarray]:
+    # Strided views are O(n*w), so only short windows use them; Bottleneck's deque is O(n)
+    if window <= 32:
+        w = sliding_window_view(close, window)
+        pad = np.full(window - 1, np.nan, dtype=close.dtype)
+        return np.concatenate([pad, w.min(axis=1)]), np.concatenate([pad, w.max(axis=1)])
+    return bn.move_min(close, window, min_count=window), bn.move_max(close, window, min_count=window)
 
-prices["Adj_Support"] = prices["Base_Support"] - (prices["RSI_diff"] * prices["Range"])
-prices["Adj_Resistance"] = prices["Base_Resistance"] + (prices["RSI_diff"] * prices["Range"])
-prices["Midline"] = (prices["Adj_Support"] + prices["Adj_Resistance"]) / 2
+# _df is skipped by Streamlit's hasher (leading underscore); df_key fingerprints its contents
+@st.cache_data(ttl=600, show_spinner=False)
+def compute_indicators(df_key: str, _df: pd.DataFrame, rsi_p: int, lb: int, sm: int):
+    prices = _df.astype({col: np.float32 for col in ("Open", "High", "Low", "Close", "Volume")})
 
-prices["Smooth_Support"] = prices["Adj_Support"].rolling(smoothLength, min_periods=smoothLength).mean()
-prices["Smooth_Resistance"] = prices["Adj_Resistance"].rolling(smoothLength, min_periods=smoothLength).mean()
-prices["Smooth_Midline"] = prices["Midline"].rolling(smoothLength, min_periods=smoothLength).mean()
+    close = prices["Close"].to_numpy()
+    rsi = rsi_kernel()(close, rsi_p)
 
-valid = prices.dropna(subset=["Smooth_Support", "Smooth_Resistance", "Smooth_Midline", "RSI"]).copy()
+    base_sup, base_res = rolling_min_max(close, lb)
+    rng = base_res - base_sup
 
-if valid.empty:
-    st.warning(
-        "Not enough bars after applying lookback/smoothing. Increase the period, reduce lookback/smoothing, or choose a higher timeframe."
+    # numexpr evaluates each expression in one threaded pass without numpy temporaries;
+    # literals would be doubles and upcast float32 input, so the constant is passed typed
+    fifty = close.dtype.type(50.0)
+    shift = ne.evaluate("abs(rsi - fifty) / fifty * rng")
+    adj_sup = ne.evaluate("base_sup - shift")
+    adj_res = ne.evaluate("base_res + shift")
+
+    # One move_mean over a (2, n) stack instead of separate passes; the rolling mean is
+    # linear, so the smoothed midline is just the average of the two smoothed levels
+    smoothed = bn.move_mean(np.stack([adj_sup, adj_res]), sm, min_count=sm, axis=-1)
+    smooth_mid = (smoothed[0] + smoothed[1]) * 0.5
+
+    prices = prices.assign(
+        RSI=rsi,
+        Base_Support=base_sup,
+        Base_Resistance=base_res,
+        Range=rng,
+        Adj_Support=adj_sup,
+        Adj_Resistance=adj_res,
+        Smooth_Support=smoothed[0],
+        Smooth_Resistance=smoothed[1],
+        Smooth_Midline=smooth_mid,
     )
-    st.stop()
 
-valid["Buy_Signal"] = (
-    (valid["Close"] > valid["Smooth_Support"]) &
-    (valid["Close"].shift(1) <= valid["Smooth_Support"].shift(1)) &
-    (valid["RSI"] > valid["RSI"].shift(1))
-)
-valid["Sell_Signal"] = (
-    (valid["Close"] < valid["Smooth_Resistance"]) &
-    (valid["Close"].shift(1) >= valid["Smooth_Resistance"].shift(1)) &
-    (valid["RSI"] < valid["RSI"].shift(1))
-)
+    valid = prices.dropna(subset=["Smooth_Support", "Smooth_Resistance", "Smooth_Midline", "RSI"])
+    if valid.empty:
+        return valid, None, None, None, None
+
+    c = valid["Close"].to_numpy()
+    ss = valid["Smooth_Support"].to_numpy()
+    sr = valid["Smooth_Resistance"].to_numpy()
+    r = valid["RSI"].to_numpy()
+
+    buy = np.zeros(len(c), dtype=bool)
+    buy[1:] = (c[1:] > ss[1:]) & (c[:-1] <= ss[:-1]) & (r[1:] > r[:-1])
+    sell = np.zeros(len(c), dtype=bool)
+    sell[1:] = (c[1:] < sr[1:]) & (c[:-1] >= sr[:-1]) & (r[1:] < r[:-1])
 
-latest = valid.iloc[-1]
+    valid = valid.assign(Buy_Signal=buy, Sell_Signal=sell)
+
+    # Built once per data change rather than re-projected on every rerun
+    recent = valid[[
+        'Close','RSI','Smooth_Support','Smooth_Resistance','Smooth_Midline','Buy_Signal','Sell_Signal'
+    ]].tail(20)
+
+    latest = {
+        col: valid[col].to_numpy()[-1].item()
+        for col in (
+            'Close', 'RSI', 'Smooth_Support', 'Smooth_Resistance', 'Smooth_Midline', 'Range',
+            'Base_Support', 'Base_Resistance', 'Adj_Support', 'Adj_Resistance', 'Buy_Signal', 'Sell_Signal',
+        )
+    }
+
+    return valid, latest, recent, np.flatnonzero(buy), np.flatnonzero(sell)
+
+valid, latest, recent, buy_idx, sell_idx = compute_indicators(prices_key, prices, rsiPeriod, lookback, smoothLength)
+
+if valid.empty:
+    st.warning(NOT_ENOUGH_BARS)
+    st.stop()
 
 # =========================
 # ===== Recommendations ===
@@ -160,26 +316,42 @@ with st.expander("More Levels (base vs adjusted)"):
 # =========================
 # ===== Chart =========
 # =========================
-fig, ax = plt.subplots(figsize=(12, 6))
-ax.plot(valid.index, valid['Close'], label='Close')
-ax.plot(valid.index, valid['Smooth_Support'], label='Smoothed Support')
-ax.plot(valid.index, valid['Smooth_Resistance'], label='Smoothed Resistance')
-ax.plot(valid.index, valid['Smooth_Midline'], label='Smoothed Midline')
+# cache_resource hands back the same figure object instead of unpickling (and revalidating) a copy.
+# The figure is fully determined by the ticker, the price fingerprint and the indicator inputs,
+# so the underscore-prefixed data arguments are skipped by Streamlit's hasher.
+@st.cache_resource(ttl=600, show_spinner=False)
+def build_fig(ticker: str, df_key: str, rsi_p: int, lb: int, sm: int,
+              _valid: pd.DataFrame, _buy_idx: np.ndarray, _sell_idx: np.ndarray) -> go.Figure:
+    x = _valid.index
+    close = _valid['Close'].to_numpy()
 
-ax.plot(valid[valid['Buy_Signal']].index, valid[valid['Buy_Signal']]['Close'], '^', markersize=9, label='Buy Signal')
-ax.plot(valid[valid['Sell_Signal']].index, valid[valid['Sell_Signal']]['Close'], 'v', markersize=9, label='Sell Signal')
+    fig = go.Figure()
+    fig.add_trace(go.Scattergl(x=x, y=close, mode='lines', name='Close'))
+    fig.add_trace(go.Scattergl(x=x, y=_valid['Smooth_Support'].to_numpy(), mode='lines', name='Smoothed Support'))
+    fig.add_trace(go.Scattergl(x=x, y=_valid['Smooth_Resistance'].to_numpy(), mode='lines', name='Smoothed Resistance'))
+    fig.add_trace(go.Scattergl(x=x, y=_valid['Smooth_Midline'].to_numpy(), mode='lines', name='Smoothed Midline'))
 
-ax.set_title(f"{ticker} — RSI-Adjusted Support/Resistance")
-ax.set_ylabel("Price")
-ax.legend(loc='best')
-ax.grid(True, alpha=0.3)
+    fig.add_trace(go.Scattergl(
+        x=x[_buy_idx], y=close[_buy_idx],
+        mode='markers', marker=dict(symbol='triangle-up', size=11), name='Buy Signal',
+    ))
+    fig.add_trace(go.Scattergl(
+        x=x[_sell_idx], y=close[_sell_idx],
+        mode='markers', marker=dict(symbol='triangle-down', size=11), name='Sell Signal',
+    ))
+
+    fig.update_layout(
+        title=f"{ticker} — RSI-Adjusted Support/Resistance",
+        yaxis_title="Price",
+        height=600,
+    )
+    return fig
 
-st.pyplot(fig)
+fig = build_fig(ticker, prices_key, rsiPeriod, lookback, smoothLength, valid, buy_idx, sell_idx)
+st.plotly_chart(fig, width="stretch")
 
 # =========================
 # ===== Recent Table ======
 # =========================
 st.subheader("Recent Signals & Levels")
-st.dataframe(valid.tail(20)[[
-    'Close','RSI','Smooth_Support','Smooth_Resistance','Smooth_Midline','Buy_Signal','Sell_Signal'
-]])
+st.dataframe(recent)